@@ -0,0 +1,101 @@
+# benchmark_inference.py
+#
+# Compares throughput and total memory of the NLP/ML analysis step with
+# components loaded in every worker vs. shared through utils/inference_server.py.
+#
+#   python benchmark_inference.py --workers 8 --requests 200
+
+import argparse
+import multiprocessing as mp
+import os
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+SOCKET_PATH = "/tmp/fnds-inference-bench.sock"
+SERVER_STARTUP_TIMEOUT = 120 # seconds
+
+SAMPLE_TEXTS = [
+    "BREAKING: Scientists reveal the shocking truth about a secret cure they don't want you to know.",
+    "The Federal Reserve left interest rates unchanged on Wednesday, citing steady growth in Washington.",
+    "Donald Trump was born in Nigeria according to a viral post shared thousands of times.",
+    "Lagos State government announced new road repairs across Ikeja and Victoria Island this week.",
+]
+
+
+def rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def worker(n_requests, ready, start, results):
+    sys.path.append(ROOT_DIR)
+    from utils import verifier
+    ready.put(os.getpid())
+    start.wait()
+    t0 = time.monotonic()
+    for i in range(n_requests):
+        verifier.analyze_text(SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)])
+    results.put((rss_kb(os.getpid()), time.monotonic() - t0))
+
+
+def run(mode, n_workers, n_requests):
+    server = None
+    if mode == "server":
+        os.environ["INFERENCE_SOCKET"] = SOCKET_PATH
+        os.environ.setdefault("INFERENCE_AUTHKEY", "benchmark")
+        if os.path.exists(SOCKET_PATH):
+            os.remove(SOCKET_PATH)
+        server = subprocess.Popen([sys.executable, "-m", "utils.inference_server"], cwd=ROOT_DIR)
+        deadline = time.monotonic() + SERVER_STARTUP_TIMEOUT
+        while not os.path.exists(SOCKET_PATH):
+            if server.poll() is not None:
+                sys.exit(f"Inference server exited with code {server.returncode}")
+            if time.monotonic() > deadline:
+                server.terminate()
+                sys.exit("Inference server did not start in time")
+            time.sleep(0.2)
+    else:
+        os.environ.pop("INFERENCE_SOCKET", None)
+
+    ctx = mp.get_context("spawn")
+    ready, results, start = ctx.Queue(), ctx.Queue(), ctx.Event()
+    procs = [ctx.Process(target=worker, args=(n_requests, ready, start, results)) for _ in range(n_workers)]
+    for p in procs:
+        p.start()
+    for _ in procs:
+        ready.get()
+
+    t0 = time.monotonic()
+    start.set()
+    worker_stats = [results.get() for _ in procs]
+    elapsed = time.monotonic() - t0
+    server_rss = rss_kb(server.pid) if server else 0
+
+    for p in procs:
+        p.join()
+    if server:
+        server.terminate()
+        server.wait()
+
+    total = n_workers * n_requests
+    total_rss = sum(rss for rss, _ in worker_stats) + server_rss
+    print(f"{mode:>10}: {total / elapsed:8.1f} req/s | total RSS {total_rss / 1024:8.1f} MB "
+          f"(server {server_rss / 1024:.1f} MB)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark in-process vs shared inference server")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=100, help="requests per worker")
+    args = parser.parse_args()
+
+    run("in-process", args.workers, args.requests)
+    run("server", args.workers, args.requests)
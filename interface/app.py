@@ -1,5 +1,8 @@
+import math
 import os
 import sys
+import threading
+import time
 from datetime import datetime
 from flask import Flask, render_template, request
 from typing import Dict
@@ -36,6 +39,81 @@ except Exception as e:
     print(f"[ERROR] Failed to load model_metrics.json: {e}")
 
 
+# --- Admission Control ---
+# Thresholds are per worker process; override via environment variables.
+# In-flight limits only apply when a worker serves requests concurrently: run
+# gunicorn with the gthread worker class and more threads than SHED_INFLIGHT
+# (see procfile). Sync workers handle one request at a time, so only the
+# latency limits would ever trigger.
+# DEGRADE_LATENCY is compared against full-mode latency (which includes the
+# Wikipedia/Wikidata calls), SHED_LATENCY against degraded-mode latency.
+DEGRADE_INFLIGHT = int(os.environ.get('DEGRADE_INFLIGHT', 4))
+SHED_INFLIGHT = int(os.environ.get('SHED_INFLIGHT', 8))
+DEGRADE_LATENCY = float(os.environ.get('DEGRADE_LATENCY', 8.0)) # seconds
+SHED_LATENCY = float(os.environ.get('SHED_LATENCY', 5.0)) # seconds
+RETRY_AFTER = int(os.environ.get('RETRY_AFTER', 5)) # seconds
+LATENCY_HALF_LIFE = float(os.environ.get('LATENCY_HALF_LIFE', 10.0)) # seconds
+
+
+class AdmissionController:
+    """
+    Tracks in-flight /predict requests and a moving average of backend latency
+    per mode, and decides whether a new request runs in full mode, degraded mode
+    or is shed. Full-mode latency drives degradation and degraded-mode latency
+    drives shedding, so fast degraded requests do not flip a worker back to full
+    mode. The averages halve every `half_life` seconds, so a worker recovers
+    from a burst even if no further traffic arrives.
+    """
+
+    def __init__(self, degrade_inflight, shed_inflight, degrade_latency, shed_latency,
+                 smoothing=0.2, half_life=LATENCY_HALF_LIFE):
+        self.degrade_inflight = degrade_inflight
+        self.shed_inflight = shed_inflight
+        self.degrade_latency = degrade_latency
+        self.shed_latency = shed_latency
+        self.smoothing = smoothing
+        self.half_life = half_life
+        self.in_flight = 0
+        self.avg_latency = {verifier.MODE_FULL: 0.0, verifier.MODE_DEGRADED: 0.0}
+        self._last_update = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _decay(self):
+        now = time.monotonic()
+        factor = 0.5 ** ((now - self._last_update) / self.half_life)
+        for mode in self.avg_latency:
+            self.avg_latency[mode] *= factor
+        self._last_update = now
+
+    def admit(self):
+        """
+        Returns (mode, retry_after). mode is "full" or "degraded", or None if the
+        request should be shed, in which case retry_after is the suggested wait in seconds.
+        """
+        with self._lock:
+            self._decay()
+            if self.in_flight >= self.shed_inflight:
+                return None, RETRY_AFTER
+            degraded_latency = self.avg_latency[verifier.MODE_DEGRADED]
+            if degraded_latency >= self.shed_latency:
+                # Time until the degraded-mode average decays below the shed threshold
+                recovery = self.half_life * math.log2(degraded_latency / self.shed_latency)
+                return None, max(RETRY_AFTER, math.ceil(recovery))
+            self.in_flight += 1
+            if self.in_flight > self.degrade_inflight or self.avg_latency[verifier.MODE_FULL] >= self.degrade_latency:
+                return verifier.MODE_DEGRADED, None
+            return verifier.MODE_FULL, None
+
+    def release(self, mode, elapsed):
+        with self._lock:
+            self.in_flight -= 1
+            self._decay()
+            self.avg_latency[mode] += self.smoothing * (elapsed - self.avg_latency[mode])
+
+
+admission = AdmissionController(DEGRADE_INFLIGHT, SHED_INFLIGHT, DEGRADE_LATENCY, SHED_LATENCY)
+
+
 def log_prediction(text: str, result: str) -> None:
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     with open(log_file, "a", encoding="utf-8") as f:
@@ -49,7 +127,25 @@ def index():
 @app.route("/predict", methods=["POST"])
 def predict():
     news = request.form["news"]
-    result_data = verifier.verify_news(news)
+
+    mode, retry_after = admission.admit()
+    if mode is None:
+        return (
+            render_template(
+                "index.html",
+                news=news,
+                overload_message=f"The service is busy right now. Please try again in {retry_after} seconds.",
+                model_accuracy=app_model_accuracy
+            ),
+            503,
+            {"Retry-After": str(retry_after)}
+        )
+
+    start = time.monotonic()
+    try:
+        result_data = verifier.verify_news(news, mode=mode)
+    finally:
+        admission.release(mode, time.monotonic() - start)
 
     log_prediction(news, result_data["final_verdict"])
 
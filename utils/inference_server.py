@@ -0,0 +1,170 @@
+"""
+Shared inference server for the spaCy pipeline and the ML classifier.
+
+Run one server per host and point the web workers at it with INFERENCE_SOCKET,
+so only this process holds en_core_web_sm, the vectorizer and the model.
+Server and workers must share the same INFERENCE_AUTHKEY:
+
+    INFERENCE_SOCKET=/tmp/fnds-inference.sock INFERENCE_AUTHKEY=... python -m utils.inference_server
+
+Requests from all workers are collected for up to INFERENCE_BATCH_WINDOW_MS
+(or until INFERENCE_MAX_BATCH texts are queued) and run as one batch.
+"""
+import os
+import sys
+import queue
+import threading
+import time
+from datetime import datetime
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from typing import Any, Dict, List
+
+BATCH_WINDOW_MS = float(os.environ.get("INFERENCE_BATCH_WINDOW_MS", 10))
+MAX_BATCH = int(os.environ.get("INFERENCE_MAX_BATCH", 32))
+TIMEOUT = float(os.environ.get("INFERENCE_TIMEOUT", 10.0)) # seconds
+
+
+def _authkey():
+    key = os.environ.get("INFERENCE_AUTHKEY")
+    return key.encode() if key else None
+
+
+class InferenceClient:
+    """Sends texts to the inference server; keeps one connection per thread."""
+
+    def __init__(self, address: str, timeout: float = TIMEOUT):
+        self.address = address
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = Client(self.address, family="AF_UNIX", authkey=_authkey())
+            self._local.conn = conn
+        return conn
+
+    def _reset(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    def analyze(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Raises OSError/EOFError if the server is unreachable, TimeoutError if it
+        does not reply within `timeout` seconds, AuthenticationError if the
+        INFERENCE_AUTHKEY does not match, and RuntimeError on server errors.
+        """
+        # Retry once on a fresh connection in case the server was restarted
+        for attempt in range(2):
+            try:
+                conn = self._connection()
+                conn.send(texts)
+                if not conn.poll(self.timeout):
+                    raise TimeoutError(f"no reply within {self.timeout}s")
+                status, payload = conn.recv()
+                break
+            except Exception as e:
+                # Never reuse a connection that may be out of sync with the server
+                self._reset()
+                retryable = isinstance(e, (OSError, EOFError)) and not isinstance(e, TimeoutError)
+                if attempt or not retryable:
+                    raise
+        if status != "ok":
+            raise RuntimeError(payload)
+        return payload
+
+
+class InferenceServer:
+    def __init__(self, address: str, batch_window_ms: float = BATCH_WINDOW_MS, max_batch: int = MAX_BATCH):
+        self.address = address
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch = max_batch
+        self._pending = queue.Queue()
+        self._authkey = _authkey()
+
+    def serve_forever(self) -> None:
+        from utils import verifier
+        verifier.load_components()
+        self._analyze_batch = verifier.analyze_batch
+
+        if os.path.exists(self.address):
+            os.remove(self.address)
+        listener = Listener(self.address, family="AF_UNIX", authkey=self._authkey)
+        print(f"[DEBUG] Inference server listening on {self.address} "
+              f"(batch window {self.batch_window * 1000:.0f} ms, max batch {self.max_batch})")
+
+        threading.Thread(target=self._batch_loop, daemon=True).start()
+        try:
+            while True:
+                try:
+                    conn = listener.accept()
+                except (AuthenticationError, OSError, EOFError) as e:
+                    print(f"[ERROR] {datetime.now()}: Rejected inference client: {e}")
+                    continue
+                threading.Thread(target=self._handle_connection, args=(conn,), daemon=True).start()
+        finally:
+            listener.close()
+
+    def _handle_connection(self, conn) -> None:
+        try:
+            while True:
+                texts = conn.recv()
+                if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                    conn.send(("error", "Expected a list of strings"))
+                    continue
+                job = {"texts": texts, "done": threading.Event(), "reply": None}
+                self._pending.put(job)
+                job["done"].wait()
+                conn.send(job["reply"])
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+
+    def _batch_loop(self) -> None:
+        while True:
+            jobs = [self._pending.get()]
+            try:
+                size = len(jobs[0]["texts"])
+                deadline = time.monotonic() + self.batch_window
+                while size < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        job = self._pending.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    jobs.append(job)
+                    size += len(job["texts"])
+                self._run(jobs)
+            except Exception as e:
+                print(f"[ERROR] {datetime.now()}: Inference batch failed: {e}")
+                for job in jobs:
+                    job["reply"] = ("error", str(e))
+            finally:
+                for job in jobs:
+                    job["done"].set()
+
+    def _run(self, jobs: List[Dict[str, Any]]) -> None:
+        texts = [text for job in jobs for text in job["texts"]]
+        analyses = self._analyze_batch(texts)
+        start = 0
+        for job in jobs:
+            end = start + len(job["texts"])
+            job["reply"] = ("ok", analyses[start:end])
+            start = end
+
+
+if __name__ == "__main__":
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    address = os.environ.get("INFERENCE_SOCKET", "/tmp/fnds-inference.sock")
+    if not _authkey():
+        sys.exit("[ERROR] Set INFERENCE_AUTHKEY to a shared secret before starting the inference server.")
+    InferenceServer(address).serve_forever()
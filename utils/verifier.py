@@ -1,12 +1,14 @@
 import os
 import requests
-import spacy
 import re
+import threading
 from textblob import TextBlob
 from typing import Tuple, Dict, List, Any
 from datetime import datetime
 import joblib
-from sklearn.feature_extraction.text import TfidfVectorizer
+from multiprocessing import AuthenticationError
+
+from utils import inference_server
 
 # --- Constants ---
 FACT_CHECK_SOURCES = {
@@ -35,25 +37,70 @@ CLICKBAIT_PHRASES = [
     "find out why", "the shocking truth about"
 ]
 
-# --- NLP Setup ---
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    from spacy.cli import download
-    download("en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
-
-# --- Load ML Model ---
-try:
-    MODEL_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'model'))
-    print(f"[DEBUG] Model path for loading: {MODEL_PATH}")
-    model = joblib.load(os.path.join(MODEL_PATH, 'fake_news_model.pkl'))
-    vectorizer = joblib.load(os.path.join(MODEL_PATH, 'tfidf_vectorizer.pkl'))
-    print("[DEBUG] Model and vectorizer loaded successfully.")
-except Exception as e:
-    model = None
-    vectorizer = None
-    print(f"[ERROR] {datetime.now()}: Model loading failed: {e}")
+# Verification modes: "full" runs every check, "degraded" skips the
+# outbound Wikipedia/Wikidata lookups and sentiment analysis.
+MODE_FULL = "full"
+MODE_DEGRADED = "degraded"
+
+# ml_prediction in an analysis is the model's label, ML_ERROR if the model
+# raised while predicting, ML_UNAVAILABLE if the inference server could not
+# be reached or failed, or None if no model is loaded.
+ML_ERROR = "ERROR"
+ML_UNAVAILABLE = "UNAVAILABLE"
+
+MODEL_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'model'))
+
+# When INFERENCE_SOCKET is set, spaCy and the ML model live in a shared
+# inference server process (see utils/inference_server.py) instead of here.
+# Loading them in-process when the server is down is opt-in through
+# INFERENCE_FALLBACK=inprocess, since every worker would load its own copy.
+INFERENCE_SOCKET = os.environ.get("INFERENCE_SOCKET")
+INFERENCE_FALLBACK = os.environ.get("INFERENCE_FALLBACK", "")
+
+if INFERENCE_SOCKET and not os.environ.get("INFERENCE_AUTHKEY"):
+    raise RuntimeError("INFERENCE_SOCKET is set but INFERENCE_AUTHKEY is not; "
+                       "set it to the inference server's shared secret.")
+
+nlp = None
+model = None
+vectorizer = None
+_components_loaded = False
+_components_lock = threading.Lock()
+
+# --- NLP / ML Setup ---
+def load_components() -> None:
+    global nlp, model, vectorizer, _components_loaded
+    if _components_loaded:
+        return
+    with _components_lock:
+        if _components_loaded:
+            return
+
+        import spacy
+        try:
+            nlp = spacy.load("en_core_web_sm")
+        except OSError:
+            from spacy.cli import download
+            download("en_core_web_sm")
+            nlp = spacy.load("en_core_web_sm")
+
+        try:
+            print(f"[DEBUG] Model path for loading: {MODEL_PATH}")
+            model = joblib.load(os.path.join(MODEL_PATH, 'fake_news_model.pkl'))
+            vectorizer = joblib.load(os.path.join(MODEL_PATH, 'tfidf_vectorizer.pkl'))
+            print("[DEBUG] Model and vectorizer loaded successfully.")
+        except Exception as e:
+            model = None
+            vectorizer = None
+            print(f"[ERROR] {datetime.now()}: Model loading failed: {e}")
+
+        _components_loaded = True
+
+if not INFERENCE_SOCKET:
+    load_components()
+    inference_client = None
+else:
+    inference_client = inference_server.InferenceClient(INFERENCE_SOCKET)
 
 # --- Helper Functions ---
 def log_error(error: str) -> None:
@@ -68,13 +115,16 @@ def check_unreliable_source(text: str) -> bool:
 def check_clickbait(text: str) -> bool:
     return any(phrase in text.lower() for phrase in CLICKBAIT_PHRASES)
 
-def check_grammar_quality(text: str) -> bool:
-    doc = nlp(text)
+def _grammar_quality(doc) -> bool:
     if len(list(doc.sents)) < 1:
         return False
     errors = sum(1 for sent in doc.sents if len([t for t in sent if t.pos_ in ('NOUN', 'VERB')]) < 2)
     return errors / max(1, len(list(doc.sents))) < 0.4
 
+def check_grammar_quality(text: str) -> bool:
+    load_components()
+    return _grammar_quality(nlp(text))
+
 def sentiment_analysis(text: str) -> str:
     blob = TextBlob(text)
     if blob.sentiment.polarity > 0.3:
@@ -187,20 +237,87 @@ def fact_check_claim(claim: str) -> Dict[str, str]:
         log_error(f"Fact-check search failed: {e}")
     return results
 
+def _entities(doc) -> Tuple[List[str], List[str]]:
+    persons = [ent.text for ent in doc.ents if ent.label_ == "PERSON"]
+    locations = [ent.text for ent in doc.ents if ent.label_ in ("GPE", "LOC")]
+    return persons, locations
+
 def extract_entities(text: str) -> Tuple[List[str], List[str]]:
     try:
-        doc = nlp(text)
-        persons = [ent.text for ent in doc.ents if ent.label_ == "PERSON"]
-        locations = [ent.text for ent in doc.ents if ent.label_ in ("GPE", "LOC")]
-        return persons, locations
+        load_components()
+        return _entities(nlp(text))
     except Exception as e:
         log_error(f"Entity extraction failed: {e}")
         return [], []
 
+# --- NLP / ML Analysis ---
+def analyze_batch(texts: List[str]) -> List[Dict[str, Any]]:
+    """
+    Runs the spaCy and ML parts of verification over a batch of texts, using
+    nlp.pipe and a single vectorizer.transform/model.predict call.
+    """
+    load_components()
+    analyses = []
+    for doc in nlp.pipe(texts):
+        persons, locations = _entities(doc)
+        sentences = list(doc.sents)
+        analyses.append({
+            "grammar_ok": _grammar_quality(doc),
+            "persons": persons,
+            "locations": locations,
+            "avg_sentence_length": sum(len(sent.text.split()) for sent in sentences) / max(1, len(sentences)),
+            "ml_prediction": None
+        })
+
+    if model and vectorizer:
+        try:
+            predictions = model.predict(vectorizer.transform(texts))
+            for analysis, prediction in zip(analyses, predictions):
+                analysis["ml_prediction"] = prediction
+        except Exception as e:
+            log_error(f"ML prediction failed: {e}")
+            for analysis in analyses:
+                analysis["ml_prediction"] = ML_ERROR
+
+    return analyses
+
+def _unavailable_analysis() -> Dict[str, Any]:
+    return {
+        "grammar_ok": True,
+        "persons": [],
+        "locations": [],
+        "avg_sentence_length": 0.0,
+        "ml_prediction": ML_UNAVAILABLE
+    }
+
+def analyze_text(text: str) -> Dict[str, Any]:
+    if inference_client is not None:
+        try:
+            return inference_client.analyze([text])[0]
+        except AuthenticationError as e:
+            raise RuntimeError("Inference server rejected INFERENCE_AUTHKEY; "
+                               "workers and server must share the same key.") from e
+        except TimeoutError as e:
+            log_error(f"Inference server timed out: {e}")
+            return _unavailable_analysis()
+        except (OSError, EOFError) as e:
+            if INFERENCE_FALLBACK != "inprocess":
+                log_error(f"Inference server unreachable: {e}")
+                return _unavailable_analysis()
+            log_error(f"Inference server unreachable, running in-process: {e}")
+        except Exception as e:
+            log_error(f"Inference server request failed: {e}")
+            return _unavailable_analysis()
+    return analyze_batch([text])[0]
+
 # --- Main Verification Function ---
-def verify_news(text: str) -> Dict[str, Any]:
+def verify_news(text: str, mode: str = MODE_FULL) -> Dict[str, Any]:
+    if mode not in (MODE_FULL, MODE_DEGRADED):
+        raise ValueError(f"Unknown verification mode: {mode!r}")
+    degraded = mode == MODE_DEGRADED
     result = {
         "text": text,
+        "mode": mode,
         "final_verdict": "UNVERIFIED",
         "reason": "Insufficient evidence",
         "red_flags": {},
@@ -211,24 +328,31 @@ def verify_news(text: str) -> Dict[str, Any]:
         "ml_confidence": None
     }
 
+    if not isinstance(text, str):
+        raise TypeError("Input 'text' must be a string.")
+    analysis = analyze_text(text)
+
     # Heuristic Checks
     red_flags = {
         "sensational_language": check_sensational_language(text),
         "unreliable_source": check_unreliable_source(text),
         "clickbait_phrases": check_clickbait(text),
-        "poor_grammar": not check_grammar_quality(text)
+        "poor_grammar": not analysis["grammar_ok"]
     }
     result['red_flags'] = red_flags
 
     # ML Prediction (Primary determinant for FAKE/REAL)
-    if model and vectorizer:
-        try:
-            print(f"[DEBUG] Input text type: {type(text)}, length: {len(text)}")
-            if not isinstance(text, str):
-                raise TypeError("Input 'text' must be a string.")
-            vect_text = vectorizer.transform([text])
-            prediction = model.predict(vect_text)[0]
-
+    prediction = analysis["ml_prediction"]
+    if prediction == ML_UNAVAILABLE:
+        # Infrastructure failure, not evidence about the content
+        result['ml_prediction'] = ML_UNAVAILABLE
+        result['ml_confidence'] = 0.0
+        result.update({
+            "final_verdict": "UNVERIFIED",
+            "reason": "Inference service unavailable, unable to run ML verification"
+        })
+    elif prediction is not None:
+        if prediction != ML_ERROR:
             result['ml_prediction'] = prediction
             result['ml_confidence'] = 95.0 # Set to a high fixed value
 
@@ -236,10 +360,8 @@ def verify_news(text: str) -> Dict[str, Any]:
                 "final_verdict": prediction,
                 "reason": f"ML model suggests {prediction} with {int(result['ml_confidence'])}% confidence"
             })
-
-        except Exception as e:
-            log_error(f"ML prediction failed: {e}")
-            result['ml_prediction'] = "ERROR"
+        else:
+            result['ml_prediction'] = ML_ERROR
             result['ml_confidence'] = 0.0
             result.update({
                 "final_verdict": "FAKE",
@@ -253,7 +375,11 @@ def verify_news(text: str) -> Dict[str, Any]:
 
     # --- External Fact-Checking (Wikipedia as a new source) ---
     # Perform Wikipedia fact-check, especially if ML predicted REAL
-    wikipedia_confirmed, wikipedia_contradicted, wikipedia_reason = wikipedia_fact_check(text)
+    # Skipped in degraded mode to keep outbound calls off the hot path under load
+    if degraded:
+        wikipedia_confirmed, wikipedia_contradicted, wikipedia_reason = False, False, ""
+    else:
+        wikipedia_confirmed, wikipedia_contradicted, wikipedia_reason = wikipedia_fact_check(text)
     
     if wikipedia_contradicted:
         # If Wikipedia strongly contradicts, override to FAKE
@@ -280,10 +406,10 @@ def verify_news(text: str) -> Dict[str, Any]:
     
     # Original entity verification (Wikidata) still runs and populates entity_verification
     # You might want to remove or further refine this if Wikidata is consistently unavailable
-    persons, locations = extract_entities(text)
+    persons, locations = analysis["persons"], analysis["locations"]
     entity_results = []
     
-    if persons and locations:
+    if persons and locations and not degraded:
         for person in persons[:3]:
             for location in locations[:3]:
                 verified, reason = wikidata_check(person, location)
@@ -301,13 +427,16 @@ def verify_news(text: str) -> Dict[str, Any]:
     result['fact_check_links'] = fact_check_claim(text) # Use the whole text as a claim for fact-check links
 
     # Quality Metrics
-    sentiment = sentiment_analysis(text)
+    sentiment = "Skipped" if degraded else sentiment_analysis(text)
     result['quality_metrics'] = {
         "word_count": len(text.split()),
         "proper_nouns": len(persons),
         "locations": len(locations),
-        "avg_sentence_length": sum(len(sent.text.split()) for sent in nlp(text).sents) / max(1, len(list(nlp(text).sents))),
+        "avg_sentence_length": analysis["avg_sentence_length"],
         "sentiment": sentiment
     }
 
+    if degraded:
+        result['reason'] = result['reason'] + ". (Degraded mode: external fact-checks skipped due to high load)"
+
     return result
\ No newline at end of file